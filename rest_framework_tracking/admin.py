@@ -1,6 +1,7 @@
 import datetime
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.db.models import Count
 from django.db.models.functions import TruncDay
 from django.urls import path
@@ -10,6 +11,14 @@ from .app_settings import app_settings
 from .models import APIRequestLog
 
 
+class APIRequestLogChangeList(ChangeList):
+    def get_queryset(self, request, *args, **kwargs):
+        # the list doesn't display the request and response bodies,
+        # don't fetch them from the database
+        queryset = super().get_queryset(request, *args, **kwargs)
+        return queryset.defer("data", "response", "errors")
+
+
 class APIRequestLogAdmin(admin.ModelAdmin):
     date_hierarchy = "requested_at"
     list_display = (
@@ -52,6 +61,9 @@ class APIRequestLogAdmin(admin.ModelAdmin):
             "user_agent"
         )
 
+    def get_changelist(self, request, **kwargs):
+        return APIRequestLogChangeList
+
     def changelist_view(self, request, extra_context=None):
         # Aggregate api logs per day
         chart_data = (
@@ -22,11 +22,66 @@ class AppSettings(object):
         """
         return self._setting("DECODE_REQUEST_BODY", True)
 
+    @property
+    def MAX_BODY_BYTES(self):
+        """
+        Size in bytes above which the request data is logged as its size only,
+        instead of being decoded and cleaned.
+
+        None logs request data of any size.
+        """
+        return self._setting("MAX_BODY_BYTES", None)
+
+    @property
+    def RESPONSE_LOG_MAX_BYTES(self):
+        """
+        Maximum number of bytes of the rendered response to log.
+
+        None logs the whole response.
+        """
+        return self._setting("RESPONSE_LOG_MAX_BYTES", None)
+
+    @property
+    def LOG_DATA_AS_JSON(self):
+        """
+        Store the request data and query params as JSON instead of their Python repr.
+
+        orjson is used to serialize them if it is installed.
+        """
+        return self._setting("LOG_DATA_AS_JSON", False)
+
     @property
     def PATH_LENGTH(self):
         """Maximum length of request path to log"""
         return self._setting("PATH_LENGTH", 200)
 
+    @property
+    def BATCH_LOG_WRITES(self):
+        """
+        Queue log entries and insert them in bulk from a background thread
+        instead of saving each one while the request is being handled.
+        """
+        return self._setting("BATCH_LOG_WRITES", False)
+
+    @property
+    def BATCH_SIZE(self):
+        """Maximum number of log entries inserted at once by the background writer"""
+        return self._setting("BATCH_SIZE", 1000)
+
+    @property
+    def BATCH_FLUSH_INTERVAL(self):
+        """Maximum number of seconds a log entry waits in the queue before being written"""
+        return self._setting("BATCH_FLUSH_INTERVAL", 0.1)
+
+    @property
+    def DATABASE(self):
+        """
+        Alias of the database the background writer inserts the logs in.
+
+        None uses the database routers, like the synchronous writes.
+        """
+        return self._setting("DATABASE", None)
+
     @property
     def LOOKUP_FIELD(self):
         """Field to identify user in User model"""
@@ -1,15 +1,86 @@
 import ast
 import ipaddress
+import json
 import logging
+import re
+import sys
+import time
 import traceback
+from collections import deque
 
 from django.db import connection
 from django.utils.timezone import now
 
 from .app_settings import app_settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# fields cleaned by default, as defined by django
+SENSITIVE_FIELDS = frozenset(
+    {
+        "api",
+        "token",
+        "key",
+        "secret",
+        "password",
+        "signature",
+    }
+)
+
+# First non whitespace character of the strings _clean_data evaluates. Only lists and dicts
+# get cleaned, they can also be wrapped in parentheses or preceded by comments and line continuations.
+_LITERAL_STARTS = ("[", "{", "(", "#", "\\")
+
+# content types of request bodies logged as their size rather than decoded
+_BINARY_CONTENT_TYPES = (
+    "application/octet-stream",
+    "application/pdf",
+    "application/zip",
+    "audio/",
+    "image/",
+    "video/",
+)
+
+# dotted quad without leading zeros, matching what ipaddress.IPv4Address accepts
+_IPV4_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_IPV4_RE = re.compile(r"(?:{0}\.){{3}}{0}".format(_IPV4_OCTET))
+
+
+def _copy_container(value):
+    return list(value) if isinstance(value, list) else dict(value)
+
+
+def _copy_containers(data):
+    """Copy data along with its nested lists and dicts, any other value is shared."""
+    if not isinstance(data, (list, dict)):
+        return data
+    data = _copy_container(data)
+    pending = [data]
+    while pending:
+        container = pending.pop()
+        items = enumerate(container) if type(container) is list else container.items()
+        for key, value in items:
+            if isinstance(value, (list, dict)):
+                container[key] = value = _copy_container(value)
+                pending.append(value)
+    return data
+
+
+def _json_dumps(value):
+    """Serialize cleaned data to JSON, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which json handles
+            pass
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+
 
 class BaseLoggingMixin(object):
     """Mixin to log requests"""
@@ -27,10 +98,28 @@ class BaseLoggingMixin(object):
 
     def initial(self, request, *args, **kwargs):
         self.log = {"requested_at": now()}
+        # monotonic clock reading used to time the view, immune to wall clock adjustments
+        self._request_started = time.monotonic()
+        self._exc_info = None
+        self._skip_log = self._is_method_not_logged(request)
+        if self._skip_log:
+            # the request won't be logged, don't spend time reading its data
+            return super(BaseLoggingMixin, self).initial(request, *args, **kwargs)
+
+        # The data is only cleaned in finalize_response, once we know the request is logged.
+        # The body has to be read now though, it can't be once the data has been parsed.
+        body_too_large = False
         if not getattr(self, "decode_request_body", app_settings.DECODE_REQUEST_BODY):
             self.log["data"] = ""
         else:
-            self.log["data"] = self._clean_data(request.body)
+            body = request.body
+            max_body_bytes = app_settings.MAX_BODY_BYTES
+            body_too_large = max_body_bytes is not None and len(body) > max_body_bytes
+            if body_too_large or request.content_type.startswith(_BINARY_CONTENT_TYPES):
+                # not worth decoding, let alone cleaning
+                self.log["data"] = "<{} bytes>".format(len(body))
+            else:
+                self.log["data"] = body
 
         super(BaseLoggingMixin, self).initial(request, *args, **kwargs)
 
@@ -42,11 +131,15 @@ class BaseLoggingMixin(object):
             data = self.request.data.dict()
         except AttributeError:
             data = self.request.data
-        self.log["data"] = self._clean_data(data)
+        if body_too_large:
+            return
+        # keep what was received even if the view modifies request.data
+        self.log["data"] = _copy_containers(data)
 
     def handle_exception(self, exc):
         response = super(BaseLoggingMixin, self).handle_exception(exc)
-        self.log["errors"] = traceback.format_exc()
+        # the traceback is only formatted in finalize_response if the request gets logged
+        self._exc_info = sys.exc_info()
 
         return response
 
@@ -60,8 +153,14 @@ class BaseLoggingMixin(object):
             self._should_log if hasattr(self, "_should_log") else self.should_log
         )
 
-        if should_log(request, response):
-            if (connection.settings_dict.get("ATOMIC_REQUESTS") and getattr(response, "exception", None) and connection.in_atomic_block):
+        # drop the reference to the traceback, its frames refer back to this view
+        exc_info, self._exc_info = self._exc_info, None
+        if not self._skip_log and should_log(request, response):
+            if exc_info is not None:
+                self.log["errors"] = "".join(traceback.format_exception(*exc_info))
+            # Batched logs are written by the background writer on its own connection,
+            # outside of the request transaction.
+            if (not app_settings.BATCH_LOG_WRITES and connection.settings_dict.get("ATOMIC_REQUESTS") and getattr(response, "exception", None) and connection.in_atomic_block):
                 # response with exception (HTTP status like: 401, 404, etc)
                 # pointwise disable atomic block for handle log (TransactionManagementError)
                 connection.set_rollback(True)
@@ -74,6 +173,12 @@ class BaseLoggingMixin(object):
                 rendered_content = response.getvalue()
 
             user = self._get_user(request)
+            to_clean = {"data": self.log["data"]}
+            if request.query_params:
+                to_clean["query_params"] = request.query_params.dict()
+            cleaned = self._clean_batch(to_clean)
+            # without query params, log the request data on their behalf
+            cleaned_query_params = cleaned.get("query_params", cleaned["data"])
 
             self.log.update(
                 {
@@ -84,17 +189,18 @@ class BaseLoggingMixin(object):
                     "host": request.get_host(),
                     "user_agent": request.META.get("HTTP_USER_AGENT", ""),
                     "method": request.method,
-                    "query_params": self._clean_data(request.query_params.dict()),
+                    "query_params": cleaned_query_params,
+                    "data": cleaned["data"],
                     "user": user,
                     "username_persistent": user.get_username() if user else "Anonymous",
                     "response_ms": self._get_response_ms(),
-                    "response": self._clean_data(rendered_content),
+                    "response": self._get_response(rendered_content),
                     "status_code": response.status_code,
                 }
             )
-            if self._clean_data(request.query_params.dict()) == {}:
-                self.log.update({"query_params": self.log["data"]})
             try:
+                if app_settings.LOG_DATA_AS_JSON:
+                    self._serialize_log_data()
                 self.handle_log()
             except Exception:
                 # ensure that all exceptions raised by handle_log
@@ -102,6 +208,17 @@ class BaseLoggingMixin(object):
                 logger.exception("Logging API call raise exception!")
         return response
 
+    def _serialize_log_data(self):
+        """Replace the cleaned data and query params of the log by their JSON serialization."""
+        data = self.log["data"]
+        if isinstance(data, (list, dict)):
+            self.log["data"] = _json_dumps(data)
+            if self.log["query_params"] is data:
+                self.log["query_params"] = self.log["data"]
+        query_params = self.log["query_params"]
+        if isinstance(query_params, (list, dict)):
+            self.log["query_params"] = _json_dumps(query_params)
+
     def handle_log(self):
         """
         Hook to define what happens with the log.
@@ -116,11 +233,18 @@ class BaseLoggingMixin(object):
 
     def _get_ip_address(self, request):
         """Get the remote ip address the request was generated from."""
-        ipaddr = request.META.get("HTTP_X_FORWARDED_FOR", None)
+        meta = request.META
+        ipaddr = meta.get("HTTP_X_FORWARDED_FOR", None)
         if ipaddr:
             ipaddr = ipaddr.split(",")[0]
         else:
-            ipaddr = request.META.get("REMOTE_ADDR", "").split(",")[0]
+            ipaddr = meta.get("REMOTE_ADDR", "").split(",")[0]
+
+        # Fast path for the common <ipv4 address> and <ipv4 address>:port cases,
+        # the pattern only accepts what ipaddress would return unchanged.
+        addr = ipaddr.split(":", 1)[0]
+        if _IPV4_RE.fullmatch(addr):
+            return addr
 
         # Account for IPv4 and IPv6 addresses, each possibly with port appended. Possibilities are:
         # <ipv4 address>
@@ -142,19 +266,33 @@ class BaseLoggingMixin(object):
         """Get view name."""
         method = request.method.lower()
         try:
-            attributes = getattr(self, method)
-            return (
-                type(attributes.__self__).__module__ + "." + type(attributes.__self__).__name__
-            )
-
+            view_class = type(getattr(self, method).__self__)
         except AttributeError:
             return None
 
+        # Cached in the class own __dict__, subclasses must not read the name of their parent.
+        name = view_class.__dict__.get("_logged_view_name")
+        if name is None:
+            name = sys.intern(view_class.__module__ + "." + view_class.__name__)
+            view_class._logged_view_name = name
+        return name
+
     def _get_view_method(self, request):
         """Get view method."""
         if hasattr(self, "action"):
             return self.action or None
-        return request.method.lower()
+        return sys.intern(request.method.lower())
+
+    def _get_response(self, rendered_content):
+        """Decode the rendered response, truncated to RESPONSE_LOG_MAX_BYTES if set."""
+        if rendered_content is None:
+            return None
+        max_bytes = app_settings.RESPONSE_LOG_MAX_BYTES
+        if max_bytes is not None:
+            rendered_content = rendered_content[:max_bytes]
+        if isinstance(rendered_content, bytes):
+            rendered_content = rendered_content.decode(errors="replace")
+        return rendered_content
 
     def _get_user(self, request):
         """Get user."""
@@ -168,8 +306,7 @@ class BaseLoggingMixin(object):
         Get the duration of the request response cycle is milliseconds.
         In case of negative duration 0 is returned.
         """
-        response_timedelta = now() - self.log["requested_at"]
-        response_ms = int(response_timedelta.total_seconds() * 1000)
+        response_ms = int((time.monotonic() - self._request_started) * 1000)
         return max(response_ms, 0)
 
     def should_log(self, request, response):
@@ -181,6 +318,31 @@ class BaseLoggingMixin(object):
             self.logging_methods == "__all__" or request.method in self.logging_methods
         )
 
+    def _is_method_not_logged(self, request):
+        """
+        Tell before the request is handled that it won't be logged because of logging_methods.
+        Custom should_log hooks may log any method, so the answer is always False for them.
+        """
+        if hasattr(self, "_should_log") or type(self).should_log is not BaseLoggingMixin.should_log:
+            return False
+        return not BaseLoggingMixin.should_log(self, request, None)
+
+    @property
+    def _sensitive_fields(self):
+        """Default sensitive fields along with the lowercased ones defined by the view."""
+        fields = self.sensitive_fields
+        if not fields:
+            return SENSITIVE_FIELDS
+
+        # DRF builds a view instance per request, so the merged set is cached in the class
+        # own __dict__ along with the fields it was built from, in case they were overridden.
+        view_class = type(self)
+        cached = view_class.__dict__.get("_merged_sensitive_fields")
+        if cached is None or cached[0] is not fields:
+            cached = (fields, SENSITIVE_FIELDS | {field.lower() for field in fields})
+            view_class._merged_sensitive_fields = cached
+        return cached[1]
+
     def _clean_data(self, data):
         """
         Clean a dictionary of data of potentially sensitive info before
@@ -193,35 +355,48 @@ class BaseLoggingMixin(object):
         You can define your own sensitive fields in your view by defining a set
         eg: sensitive_fields = {'field1', 'field2'}
         """
-        if isinstance(data, bytes):
-            data = data.decode(errors="replace")
-
-        if isinstance(data, list):
-            return [self._clean_data(d) for d in data]
-
-        if isinstance(data, dict):
-            SENSITIVE_FIELDS = {
-                "api",
-                "token",
-                "key",
-                "secret",
-                "password",
-                "signature",
-            }
-
-            data = dict(data)
-            if self.sensitive_fields:
-                SENSITIVE_FIELDS = SENSITIVE_FIELDS | {
-                    field.lower() for field in self.sensitive_fields
-                }
+        return self._clean_batch({"data": data})["data"]
 
-            for key, value in data.items():
-                try:
-                    value = ast.literal_eval(value)
-                except (ValueError, SyntaxError):
-                    pass
+    def _clean_batch(self, mapping):
+        """
+        Clean all the values of a mapping like _clean_data does, in a single walk
+        over their nested containers. Return a new mapping of the cleaned values.
+        """
+        sensitive_fields = self._sensitive_fields
+
+        # Walk the nested containers with a worklist rather than recursion,
+        # every container is copied before being cleaned so the input is left untouched.
+        cleaned = {}
+        pending = deque()
+        for name, data in mapping.items():
+            if isinstance(data, bytes):
+                data = data.decode(errors="replace")
+            if isinstance(data, (list, dict)):
+                data = _copy_container(data)
+                pending.append(data)
+            cleaned[name] = data
+
+        while pending:
+            container = pending.pop()
+            if isinstance(container, list):
+                for index, value in enumerate(container):
+                    if isinstance(value, (list, dict)):
+                        container[index] = value = _copy_container(value)
+                        pending.append(value)
+                continue
+
+            for key, value in container.items():
+                if key.lower() in sensitive_fields:
+                    container[key] = self.CLEANED_SUBSTITUTE
+                    continue
+                # Only strings that look like a list or a dict are worth evaluating,
+                # any other literal is left as is.
+                if isinstance(value, str) and value.lstrip()[:1] in _LITERAL_STARTS:
+                    try:
+                        value = ast.literal_eval(value)
+                    except (ValueError, SyntaxError, MemoryError, RecursionError):
+                        pass
                 if isinstance(value, (list, dict)):
-                    data[key] = self._clean_data(value)
-                if key.lower() in SENSITIVE_FIELDS:
-                    data[key] = self.CLEANED_SUBSTITUTE
-        return data
+                    container[key] = value = _copy_container(value)
+                    pending.append(value)
+        return cleaned
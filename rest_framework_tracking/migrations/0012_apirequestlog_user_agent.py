@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-14 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rest_framework_tracking", "0011_auto_20201117_2016"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="apirequestlog",
+            name="user_agent",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-14 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rest_framework_tracking", "0012_apirequestlog_user_agent"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="apirequestlog",
+            index=models.Index(
+                fields=["-requested_at", "status_code"],
+                name="drft_req_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="apirequestlog",
+            index=models.Index(
+                fields=["view", "-requested_at"], name="drft_view_req_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,9 @@
+from .app_settings import app_settings
 from .base_mixins import BaseLoggingMixin
 from .models import APIRequestLog
+from .writers import BackgroundLogWriter
+
+log_writer = BackgroundLogWriter(APIRequestLog)
 
 
 class LoggingMixin(BaseLoggingMixin):
@@ -7,9 +11,13 @@ class LoggingMixin(BaseLoggingMixin):
         """
         Hook to define what happens with the log.
 
-        Defaults on saving the data on the db.
+        Defaults on saving the data on the db, either right away or
+        through the background writer when DRF_TRACKING_BATCH_LOG_WRITES is set.
         """
-        APIRequestLog(**self.log).save()
+        if app_settings.BATCH_LOG_WRITES:
+            log_writer.put(self.log)
+        else:
+            APIRequestLog(**self.log).save()
 
 
 class LoggingErrorsMixin(LoggingMixin):
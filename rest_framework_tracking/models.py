@@ -1,5 +1,15 @@
+from django.db import models
+
 from .base_models import BaseAPIRequestLog
 
 
 class APIRequestLog(BaseAPIRequestLog):
-    pass
+    class Meta(BaseAPIRequestLog.Meta):
+        # composite indexes for the usual "latest requests by status" and
+        # "requests of a view over time" queries
+        indexes = [
+            models.Index(
+                fields=["-requested_at", "status_code"], name="drft_req_status_idx"
+            ),
+            models.Index(fields=["view", "-requested_at"], name="drft_view_req_idx"),
+        ]
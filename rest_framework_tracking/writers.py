@@ -0,0 +1,260 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import DateField, Field, TimeField
+from django.utils.functional import cached_property
+
+from .app_settings import app_settings
+
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    execute_values = None
+
+logger = logging.getLogger(__name__)
+
+# marks the fields missing from a queued log entry, None being a valid value
+_MISSING = object()
+# put on the queue to wake up the writer thread when it is stopped
+_STOP = object()
+
+
+class BackgroundLogWriter(object):
+    """
+    Buffer log entries in memory and insert them in bulk from a daemon thread.
+
+    Entries are flushed once BATCH_SIZE of them are queued or BATCH_FLUSH_INTERVAL
+    seconds went by since the first entry of the batch was queued, whichever comes first.
+
+    Django connections are per thread, so the writes never take part in the
+    transactions of the requests that produced the entries.
+
+    The entries are queued as tuples of their field values rather than dicts,
+    they take a fraction of the memory while waiting and transpose to columns with zip().
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+
+    def start(self):
+        """Start the writer thread unless it is already running."""
+        # called for every logged request, only take the lock when the thread must be started
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="drf-api-tracking-writer", daemon=True
+            )
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self, timeout=5):
+        """
+        Stop the writer thread and write all the queued entries.
+
+        The thread writes the batch it is collecting right away rather than waiting
+        BATCH_FLUSH_INTERVAL for more entries, the ones left in the queue are written
+        in the calling thread.
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._stopping.set()
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        self.flush()
+
+    @cached_property
+    def fields(self):
+        """Fields inserted by the writer, in the order of the queued values."""
+        opts = self.model._meta
+        return [field for field in opts.concrete_fields if field is not opts.auto_field]
+
+    @cached_property
+    def _field_keys(self):
+        """Name, attname and, for relations, target attname of the fields."""
+        return [
+            (field.name, field.attname, field.target_field.attname if field.is_relation else None)
+            for field in self.fields
+        ]
+
+    @cached_property
+    def _field_attnames(self):
+        return [field.attname for field in self.fields]
+
+    @cached_property
+    def _known_keys(self):
+        return frozenset(field.name for field in self.fields) | frozenset(self._field_attnames)
+
+    def put(self, entry):
+        """
+        Queue a log entry for insertion, a dict keyed by field names or attnames
+        like the keyword arguments of the model.
+
+        Relations are queued as the value of their attname rather than as instances.
+        """
+        self.start()
+        values = []
+        for name, attname, related_attname in self._field_keys:
+            value = entry.get(name, _MISSING)
+            if value is _MISSING:
+                value = entry.get(attname, _MISSING)
+            elif related_attname is not None and value is not None:
+                value = getattr(value, related_attname)
+            values.append(value)
+        if not self._known_keys.issuperset(entry):
+            # saving the model right away would raise a TypeError for these
+            logger.warning(
+                "Ignoring unknown API call log fields: %s",
+                ", ".join(sorted(set(entry) - self._known_keys)),
+            )
+        self._queue.put(tuple(values))
+
+    def flush(self):
+        """Write all the queued entries in the calling thread."""
+        entries = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                entries.append(entry)
+        if entries:
+            self.write(entries)
+
+    def write(self, entries):
+        """Insert a batch of log entries."""
+        batch_size = app_settings.BATCH_SIZE
+        try:
+            using = app_settings.DATABASE or router.db_for_write(self.model)
+            connection = connections[using]
+            if self._can_execute_values(connection):
+                self._execute_values(connection, entries, batch_size)
+            else:
+                self.model.objects.using(using).bulk_create(
+                    self._build_objs(entries), batch_size=batch_size
+                )
+        except Exception:
+            # the request that produced these entries is long gone,
+            # so all we can do is report the failure
+            logger.exception("Writing %d API call logs raise exception!", len(entries))
+
+    def _build_objs(self, entries):
+        """Build model instances from queued entries."""
+        names = self._field_attnames
+        return [
+            self.model(
+                **{name: value for name, value in zip(names, entry) if value is not _MISSING}
+            )
+            for entry in entries
+        ]
+
+    @cached_property
+    def _pre_save_fields(self):
+        """Fields computing their value when saved, like auto_now dates."""
+        fields = set()
+        for field in self.fields:
+            if isinstance(field, (DateField, TimeField)):
+                # these override pre_save but only use it for auto_now and auto_now_add
+                if field.auto_now or field.auto_now_add:
+                    fields.add(field)
+            elif type(field).pre_save is not Field.pre_save:
+                fields.add(field)
+        return fields
+
+    def _can_execute_values(self, connection):
+        if execute_values is None or connection.vendor != "postgresql":
+            return False
+        # the postgresql backend may be running on psycopg 3
+        return connection.Database.__name__ == "psycopg2"
+
+    def _execute_values(self, connection, entries, page_size):
+        """
+        Insert the logs with psycopg2's execute_values, which sends much larger
+        multi-row INSERT statements than the ORM builds.
+        """
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        fields = self.fields
+        sql = "INSERT INTO {} ({}) VALUES %s".format(
+            qn(opts.db_table), ", ".join(qn(field.column) for field in fields)
+        )
+        # Prepare the values one column at a time straight from the queued entries, each field
+        # is only looked up once per batch. Model instances are only built when some fields
+        # need them to compute their value in pre_save.
+        objs = self._build_objs(entries) if self._pre_save_fields else None
+        columns = []
+        for field, values in zip(fields, zip(*entries)):
+            if field in self._pre_save_fields:
+                prep = field.get_db_prep_save
+                columns.append(
+                    [prep(field.pre_save(obj, True), connection) for obj in objs]
+                )
+            else:
+                columns.append(self._prepare_column(field, values, connection))
+        rows = list(zip(*columns))
+        with transaction.atomic(using=connection.alias, savepoint=False):
+            with connection.cursor() as cursor:
+                execute_values(cursor.cursor, sql, rows, page_size=page_size)
+
+    def _prepare_column(self, field, values, connection):
+        """Get the database values of a field for all the entries, as the ORM would save them."""
+        # a callable default is called for each entry, as when saving instances
+        callable_default = callable(field.default)
+        default = None if callable_default else field.get_default()
+        prep = field.get_db_prep_save
+        column = []
+        for value in values:
+            if value is _MISSING:
+                value = field.get_default() if callable_default else default
+            column.append(prep(value, connection))
+        return column
+
+    def _collect(self):
+        """
+        Block until an entry is queued, then gather a batch around it.
+
+        Returns early, possibly with no entries, when the writer is stopped.
+        """
+        entry = self._queue.get()
+        if entry is _STOP:
+            return []
+        entries = [entry]
+        batch_size = app_settings.BATCH_SIZE
+        deadline = time.monotonic() + app_settings.BATCH_FLUSH_INTERVAL
+        while len(entries) < batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                break
+            entries.append(entry)
+        return entries
+
+    def _run(self):
+        while not self._stopping.is_set():
+            entries = self._collect()
+            if entries:
+                self.write(entries)
+            # the thread owns its connection, make sure it is recycled
+            # according to CONN_MAX_AGE and dropped if it became unusable
+            close_old_connections()
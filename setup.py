@@ -92,6 +92,9 @@ setup(
         'djangorestframework>=3',
         'pytz',
     ],
+    extras_require={
+        'orjson': ['orjson'],
+    },
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Environment :: Web Environment',
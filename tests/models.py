@@ -0,0 +1,12 @@
+import uuid
+
+from django.db import models
+from rest_framework_tracking.base_models import BaseAPIRequestLog
+
+
+class TimestampedAPIRequestLog(BaseAPIRequestLog):
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class UUIDAPIRequestLog(BaseAPIRequestLog):
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True)
@@ -0,0 +1,29 @@
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.utils.timezone import now
+from rest_framework_tracking.admin import APIRequestLogAdmin
+from rest_framework_tracking.models import APIRequestLog
+import pytest
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAPIRequestLogAdmin(TestCase):
+    def setUp(self):
+        self.model_admin = APIRequestLogAdmin(APIRequestLog, AdminSite())
+        self.request = RequestFactory().get('/admin/rest_framework_tracking/apirequestlog/')
+        self.request.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_changelist_defers_bodies(self):
+        APIRequestLog.objects.create(remote_addr='127.0.0.1', requested_at=now(), data='{}')
+        changelist = self.model_admin.get_changelist_instance(self.request)
+        deferred_fields, defer = changelist.queryset.query.deferred_loading
+        self.assertTrue(defer)
+        self.assertEqual(deferred_fields, {'data', 'response', 'errors'})
+        self.assertEqual(changelist.result_count, 1)
+
+    def test_queryset_doesnt_defer_bodies(self):
+        deferred_fields, defer = self.model_admin.get_queryset(self.request).query.deferred_loading
+        self.assertEqual(deferred_fields, frozenset())
@@ -3,7 +3,6 @@ from __future__ import absolute_import
 
 import pytest
 import ast
-import datetime
 from io import BytesIO
 import json
 from django.contrib.auth.models import User
@@ -13,7 +12,7 @@ from flaky import flaky
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIRequestFactory, APITestCase
-from rest_framework_tracking.mixins import BaseLoggingMixin
+from rest_framework_tracking.mixins import BaseLoggingMixin, log_writer
 from rest_framework_tracking.models import APIRequestLog
 
 try:
@@ -21,7 +20,7 @@ try:
 except Exception:
     from unittest import mock
 
-from .views import MockLoggingView
+from .views import MockLoggingView, MockSensitiveFieldsLoggingView
 
 pytestmark = pytest.mark.django_db
 
@@ -149,11 +148,23 @@ class TestLoggingMixin(APITestCase):
         self.client.post('/explicit-logging')
         self.assertEqual(APIRequestLog.objects.all().count(), 1)
 
+    def test_logging_explicit_skips_data_cleaning(self):
+        with mock.patch.object(BaseLoggingMixin, '_clean_batch') as mock_clean_batch:
+            self.client.get('/explicit-logging', {'p1': 'a'})
+        mock_clean_batch.assert_not_called()
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+
     def test_custom_check_logging(self):
         self.client.get('/custom-check-logging')
         self.client.post('/custom-check-logging')
         self.assertEqual(APIRequestLog.objects.all().count(), 1)
 
+    def test_custom_check_logging_skips_data_cleaning(self):
+        with mock.patch.object(BaseLoggingMixin, '_clean_batch') as mock_clean_batch:
+            self.client.post('/custom-check-logging', {'val': 1}, format='json')
+        mock_clean_batch.assert_not_called()
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+
     def test_custom_check_logging_deprecated(self):
         self.client.get('/custom-check-logging-deprecated')
         self.client.post('/custom-check-logging-deprecated')
@@ -249,6 +260,14 @@ class TestLoggingMixin(APITestCase):
         })
         self.assertIn(log.data, expected_data)
 
+    def test_log_data_json_modified_by_view(self):
+        self.client.post('/mutating-data-logging', {'nested': {'val': 'a'}, 'items': [{'val': 'b'}]},
+                         format='json')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(ast.literal_eval(log.data), {
+            u'nested': {u'val': u'a'},
+            u'items': [{u'val': u'b'}]})
+
     def test_log_list_data_json(self):
         self.client.post('/logging', [1, 2, {'k1': 1, 'k2': 2}, {'k3': 3}], format='json')
 
@@ -294,6 +313,68 @@ class TestLoggingMixin(APITestCase):
         })
         self.assertIn(log.data, expected_data)
 
+    def test_log_stringified_params_cleaned(self):
+        self.client.get('/logging', {'filters': "[{'password': '1234', 'val': 'a'}]", 'page': '(1, 2)'})
+        log = APIRequestLog.objects.first()
+        self.assertEqual(ast.literal_eval(log.query_params), {
+            u'filters': [{u'password': BaseLoggingMixin.CLEANED_SUBSTITUTE, u'val': u'a'}],
+            u'page': u'(1, 2)'})
+
+    @override_settings(DRF_TRACKING_LOG_DATA_AS_JSON=True)
+    def test_log_data_as_json(self):
+        self.client.post('/logging', {'password': '123456', 'val2': [{'val': None}]}, format='json')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(json.loads(log.data), {
+            u'password': BaseLoggingMixin.CLEANED_SUBSTITUTE,
+            u'val2': [{u'val': None}]})
+        self.assertEqual(log.query_params, log.data)
+
+    @override_settings(DRF_TRACKING_LOG_DATA_AS_JSON=True)
+    @mock.patch('rest_framework_tracking.base_mixins.orjson', None)
+    def test_log_params_as_json_without_orjson(self):
+        self.client.get('/logging', {'p1': 'a', 'key': '2'})
+        log = APIRequestLog.objects.first()
+        self.assertEqual(json.loads(log.query_params), {
+            u'p1': u'a',
+            u'key': BaseLoggingMixin.CLEANED_SUBSTITUTE})
+
+    @override_settings(DRF_TRACKING_LOG_DATA_AS_JSON=True)
+    def test_log_big_integer_as_json(self):
+        response = self.client.post('/logging', {'id': 2 ** 70}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log = APIRequestLog.objects.first()
+        self.assertEqual(json.loads(log.data), {u'id': 2 ** 70})
+
+    @override_settings(DRF_TRACKING_LOG_DATA_AS_JSON=True)
+    @mock.patch('rest_framework_tracking.base_mixins._json_dumps')
+    def test_log_as_json_failure_doesnt_prevent_api_call(self, mock_json_dumps):
+        mock_json_dumps.side_effect = TypeError('not serializable')
+        response = self.client.get('/logging', {'p1': 'a'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+
+    @override_settings(DRF_TRACKING_LOG_DATA_AS_JSON=True)
+    def test_log_multipart_file_as_json(self):
+        file = BytesIO('test data'.encode('utf-8'))
+        file.name = 'test.txt'
+        self.client.post('/multipart-logging', {'file': file}, format='multipart')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(json.loads(log.data), {u'file': u'test.txt'})
+
+    def test_log_whitespace_prefixed_stringified_params_cleaned(self):
+        self.client.get('/logging', {'filters': "\n[{'password': 'hunter2'}]", 'other': "\r\n\f{'api': 'x'}"})
+        log = APIRequestLog.objects.first()
+        self.assertEqual(ast.literal_eval(log.query_params), {
+            u'filters': [{u'password': BaseLoggingMixin.CLEANED_SUBSTITUTE}],
+            u'other': {u'api': BaseLoggingMixin.CLEANED_SUBSTITUTE}})
+
+    def test_log_wrapped_stringified_params_cleaned(self):
+        self.client.get('/logging', {'filters': "([{'password': 'hunter2'}])", 'other': "#comment\n{'api': 'x'}"})
+        log = APIRequestLog.objects.first()
+        self.assertEqual(ast.literal_eval(log.query_params), {
+            u'filters': [{u'password': BaseLoggingMixin.CLEANED_SUBSTITUTE}],
+            u'other': {u'api': BaseLoggingMixin.CLEANED_SUBSTITUTE}})
+
     def test_log_exact_match_params_cleaned(self):
         self.client.get('/logging', {'api': '1234', 'capitalized': '12345', 'keyword': '123456'})
         log = APIRequestLog.objects.first()
@@ -319,6 +400,16 @@ class TestLoggingMixin(APITestCase):
             u'capitalized': '12345',
             u'my_field': BaseLoggingMixin.CLEANED_SUBSTITUTE})
 
+    def test_sensitive_fields_merged_once_per_view_class(self):
+        sensitive_fields = MockSensitiveFieldsLoggingView()._sensitive_fields
+        self.assertIn('my_field', sensitive_fields)
+        self.assertIs(MockSensitiveFieldsLoggingView()._sensitive_fields, sensitive_fields)
+        # fields overridden on an instance are merged on their own
+        view = MockSensitiveFieldsLoggingView()
+        view.sensitive_fields = {'other_field'}
+        self.assertIn('other_field', view._sensitive_fields)
+        self.assertNotIn('my_field', view._sensitive_fields)
+
     def test_invalid_cleaned_substitute_fails(self):
         with self.assertRaises(AssertionError):
             self.client.get('/invalid-cleaned-substitute-logging')
@@ -333,6 +424,12 @@ class TestLoggingMixin(APITestCase):
         log = APIRequestLog.objects.first()
         self.assertEqual(log.response, u'{"get":"response"}')
 
+    @override_settings(DRF_TRACKING_RESPONSE_LOG_MAX_BYTES=6)
+    def test_log_response_truncated(self):
+        self.client.get('/json-logging')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(log.response, u'{"get"')
+
     def test_log_json_post_response(self):
         self.client.post('/json-logging', {}, format='json')
         log = APIRequestLog.objects.first()
@@ -381,6 +478,12 @@ class TestLoggingMixin(APITestCase):
         self.assertIn('response', log.response)
         self.assertIn('Traceback', log.errors)
 
+    @mock.patch('rest_framework_tracking.base_mixins.traceback.format_exception')
+    def test_no_traceback_formatting_without_log(self, mock_format_exception):
+        self.client.get('/explicit-logging-exception')
+        mock_format_exception.assert_not_called()
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+
     def test_log_request_415_error(self):
         content_type = 'text/plain'
         self.client.post('/415-error-logging', {}, content_type=content_type)
@@ -403,6 +506,13 @@ class TestLoggingMixin(APITestCase):
         log = APIRequestLog.objects.first()
         self.assertEqual(log.view, 'tests.views.MockNameViewSet')
 
+    def test_log_view_name_not_inherited(self):
+        self.client.get('/no-view-log')
+        self.client.get('/child-no-view-log')
+        self.assertEqual(
+            list(APIRequestLog.objects.order_by('id').values_list('view', flat=True)),
+            ['tests.views.MockNameAPIView', 'tests.views.MockChildNameAPIView'])
+
     def test_log_view_method_name_api_view(self):
         self.client.get('/no-view-log')
         log = APIRequestLog.objects.first()
@@ -471,6 +581,18 @@ class TestLoggingMixin(APITestCase):
         self.assertEqual(log.data, 'INVALID JSON')
         self.assertIn('parse error', log.response)
 
+    @override_settings(DRF_TRACKING_MAX_BODY_BYTES=10)
+    def test_log_data_too_large(self):
+        self.client.post('/logging', '{"password": "123456"}', content_type='application/json')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(log.data, '<22 bytes>')
+
+    def test_log_binary_data(self):
+        self.client.post('/logging', b'\x89PNG', content_type='image/png')
+        log = APIRequestLog.objects.first()
+        self.assertEqual(log.status_code, 415)
+        self.assertEqual(log.data, '<4 bytes>')
+
     @mock.patch('rest_framework_tracking.models.APIRequestLog.save')
     def test_log_doesnt_prevent_api_call_if_log_save_fails(self, mock_apirequestlog_save):
         mock_apirequestlog_save.side_effect = Exception('db failure')
@@ -478,12 +600,10 @@ class TestLoggingMixin(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(APIRequestLog.objects.all().count(), 0)
 
-    @mock.patch('rest_framework_tracking.base_mixins.now')
-    def test_log_doesnt_fail_with_negative_response_ms(self, mock_now):
-        mock_now.side_effect = [
-            datetime.datetime(2017, 12, 1, 10, 0, 10),
-            datetime.datetime(2017, 12, 1, 10)
-        ]
+    @mock.patch('rest_framework_tracking.base_mixins.time')
+    def test_log_doesnt_fail_with_negative_response_ms(self, mock_time):
+        # only the module's reference is replaced, time.monotonic stays usable elsewhere
+        mock_time.monotonic.side_effect = [10.0, 0.0]
         self.client.get('/logging')
         log = APIRequestLog.objects.first()
         self.assertEqual(log.response_ms, 0)
@@ -498,3 +618,47 @@ class TestLoggingMixin(APITestCase):
         content_type = "multipart/form-data; boundary=_"
         response = self.client.post('/decode-request-body-false', {"data": "some test data"}, content_type=content_type)
         self.assertEqual(response.status_code, 200)
+
+    @override_settings(DRF_TRACKING_BATCH_LOG_WRITES=True)
+    @mock.patch.object(log_writer, 'start')
+    def test_batch_log_writes(self, mock_start):
+        self.client.get('/logging')
+        self.client.post('/logging')
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+        log_writer.flush()
+        self.assertEqual(APIRequestLog.objects.all().count(), 2)
+        self.assertEqual(
+            list(APIRequestLog.objects.order_by('id').values_list('method', 'path', 'status_code')),
+            [('GET', '/logging', 200), ('POST', '/logging', 200)])
+
+    @override_settings(DRF_TRACKING_BATCH_LOG_WRITES=True)
+    @mock.patch.object(log_writer, 'start')
+    @mock.patch('django.db.models.query.QuerySet.bulk_create')
+    def test_batch_log_writes_failure_is_swallowed(self, mock_bulk_create, mock_start):
+        mock_bulk_create.side_effect = Exception('db failure')
+        response = self.client.get('/logging')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        log_writer.flush()
+        self.assertEqual(APIRequestLog.objects.all().count(), 0)
+
+    @override_settings(DRF_TRACKING_BATCH_LOG_WRITES=True, DRF_TRACKING_BATCH_SIZE=10)
+    @mock.patch.object(log_writer, 'start')
+    @mock.patch.object(log_writer, '_can_execute_values', return_value=True)
+    @mock.patch('rest_framework_tracking.writers.execute_values', create=True)
+    def test_batch_log_writes_execute_values(self, mock_execute_values, mock_can_execute_values, mock_start):
+        user = User.objects.create_user(username='myname', password='secret')
+        self.client.login(username='myname', password='secret')
+        self.client.get('/session-auth-logging')
+        log_writer.flush()
+        self.assertEqual(mock_execute_values.call_count, 1)
+        _, sql, rows = mock_execute_values.call_args[0]
+        self.assertIn('rest_framework_tracking_apirequestlog', sql)
+        self.assertEqual(len(rows), 1)
+        row = dict(zip((field.attname for field in log_writer.fields), rows[0]))
+        self.assertEqual(row['path'], '/session-auth-logging')
+        # the foreign key is written as the user pk
+        self.assertEqual(row['user_id'], user.pk)
+        self.assertEqual(row['username_persistent'], 'myname')
+        # no exception was raised, errors gets the field default
+        self.assertIsNone(row['errors'])
+        self.assertEqual(mock_execute_values.call_args[1], {'page_size': 10})
@@ -0,0 +1,112 @@
+import time
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework_tracking.models import APIRequestLog
+from rest_framework_tracking.writers import BackgroundLogWriter
+import pytest
+
+from .models import TimestampedAPIRequestLog, UUIDAPIRequestLog
+
+try:
+    import mock
+except Exception:
+    from unittest import mock
+
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBackgroundLogWriter(TestCase):
+    def setUp(self):
+        self.entry = {
+            'requested_at': now(),
+            'path': '/logging',
+            'remote_addr': '127.0.0.1',
+            'host': 'testserver',
+            'method': 'GET',
+        }
+
+    def _execute_values_rows(self, writer, count=1):
+        with mock.patch.object(writer, 'start'), \
+                mock.patch.object(writer, '_can_execute_values', return_value=True), \
+                mock.patch('rest_framework_tracking.writers.execute_values', create=True) as mock_execute_values:
+            for _ in range(count):
+                writer.put(self.entry)
+            writer.flush()
+        self.assertEqual(mock_execute_values.call_count, 1)
+        _, _, rows = mock_execute_values.call_args[0]
+        return [dict(zip((field.attname for field in writer.fields), row)) for row in rows]
+
+    def test_execute_values_defaults(self):
+        writer = BackgroundLogWriter(APIRequestLog)
+        self.assertEqual(writer._pre_save_fields, set())
+        [row] = self._execute_values_rows(writer)
+        self.assertEqual(row['response_ms'], 0)
+        self.assertEqual(row['user_agent'], '')
+        self.assertIsNone(row['user_id'])
+
+    def test_execute_values_attname(self):
+        user = User.objects.create_user(username='myname', password='secret')
+        self.entry['user_id'] = user.pk
+        writer = BackgroundLogWriter(APIRequestLog)
+        [row] = self._execute_values_rows(writer)
+        self.assertEqual(row['user_id'], user.pk)
+
+    def test_execute_values_callable_default(self):
+        writer = BackgroundLogWriter(UUIDAPIRequestLog)
+        rows = self._execute_values_rows(writer, count=3)
+        self.assertEqual(len({row['uuid'] for row in rows}), 3)
+
+    def test_execute_values_pre_save(self):
+        writer = BackgroundLogWriter(TimestampedAPIRequestLog)
+        with mock.patch('django.utils.timezone.now', return_value=self.entry['requested_at']):
+            [row] = self._execute_values_rows(writer)
+        # auto_now_add was applied and prepared like any other datetime
+        self.assertEqual(row['created_at'], row['requested_at'])
+
+    def test_bulk_create_pre_save(self):
+        writer = BackgroundLogWriter(TimestampedAPIRequestLog)
+        with mock.patch.object(writer, 'start'):
+            writer.put(self.entry)
+            writer.flush()
+        log = TimestampedAPIRequestLog.objects.get()
+        self.assertEqual(log.path, '/logging')
+        self.assertIsNotNone(log.created_at)
+
+    def test_bulk_create_attname(self):
+        user = User.objects.create_user(username='myname', password='secret')
+        self.entry['user_id'] = user.pk
+        writer = BackgroundLogWriter(APIRequestLog)
+        with mock.patch.object(writer, 'start'):
+            writer.put(self.entry)
+            writer.flush()
+        self.assertEqual(APIRequestLog.objects.get().user, user)
+
+    def test_unknown_fields_warning(self):
+        self.entry['unknown'] = 'value'
+        writer = BackgroundLogWriter(APIRequestLog)
+        with mock.patch.object(writer, 'start'), \
+                self.assertLogs('rest_framework_tracking.writers', 'WARNING') as logs:
+            writer.put(self.entry)
+            writer.flush()
+        self.assertIn('unknown', logs.output[0])
+        self.assertEqual(APIRequestLog.objects.get().path, '/logging')
+
+    @override_settings(DRF_TRACKING_BATCH_FLUSH_INTERVAL=60)
+    def test_stop_writes_collected_batch(self):
+        writer = BackgroundLogWriter(APIRequestLog)
+        batches = []
+        with mock.patch.object(writer, 'write', side_effect=batches.append):
+            for _ in range(5):
+                writer.put(self.entry)
+            # wait for the thread to take the entries off the queue, it then
+            # waits for more of them until the flush interval is over
+            deadline = time.monotonic() + 5
+            while not writer._queue.empty() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(writer._queue.empty())
+            writer.stop()
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual([len(batch) for batch in batches], [5])
@@ -20,6 +20,7 @@ urlpatterns = [
     re_path(r'^logging-exception$', test_views.MockLoggingView.as_view()),
     re_path(r'^slow-logging$', test_views.MockSlowLoggingView.as_view()),
     re_path(r'^explicit-logging$', test_views.MockExplicitLoggingView.as_view()),
+    re_path(r'^explicit-logging-exception$', test_views.MockExplicitLoggingExceptionView.as_view()),
     re_path(r'^sensitive-fields-logging$', test_views.MockSensitiveFieldsLoggingView.as_view()),
     re_path(r'^invalid-cleaned-substitute-logging$', test_views.MockInvalidCleanedSubstituteLoggingView.as_view()),
     re_path(r'^custom-check-logging-deprecated$', test_views.MockCustomCheckLoggingViewDeprecated.as_view()),
@@ -31,6 +32,7 @@ urlpatterns = [
     re_path(r'^session-auth-logging$', test_views.MockSessionAuthLoggingView.as_view()),
     re_path(r'^token-auth-logging$', test_views.MockTokenAuthLoggingView.as_view()),
     re_path(r'^json-logging$', test_views.MockJSONLoggingView.as_view()),
+    re_path(r'^mutating-data-logging$', test_views.MockMutatingDataLoggingView.as_view()),
     re_path(r'^multipart-logging$', test_views.MockMultipartLoggingView.as_view()),
     re_path(r'^streaming-logging$', test_views.MockStreamingLoggingView.as_view()),
     re_path(r'^validation-error-logging$', test_views.MockValidationErrorLoggingView.as_view()),
@@ -38,6 +40,7 @@ urlpatterns = [
     re_path(r'^500-error-logging$', test_views.Mock500ErrorLoggingView.as_view()),
     re_path(r'^415-error-logging$', test_views.Mock415ErrorLoggingView.as_view()),
     re_path(r'^no-view-log$', test_views.MockNameAPIView.as_view()),
+    re_path(r'^child-no-view-log$', test_views.MockChildNameAPIView.as_view()),
     re_path(r'^view-log$', test_views.MockNameViewSet.as_view({'get': 'list'})),
     re_path(r'^400-body-parse-error-logging$', test_views.Mock400BodyParseErrorLoggingView.as_view()),
     re_path(r'^decode-request-body-false$', test_views.MockDecodeRequestBodyFalse.as_view()),
@@ -52,6 +52,13 @@ class MockExplicitLoggingView(LoggingMixin, APIView):
         return Response('with logging')
 
 
+class MockExplicitLoggingExceptionView(LoggingMixin, APIView):
+    logging_methods = ['POST']
+
+    def get(self, request):
+        raise APIException('no logging')
+
+
 class MockSensitiveFieldsLoggingView(LoggingMixin, APIView):
     sensitive_fields = {'mY_fiEld'}
 
@@ -162,6 +169,13 @@ class MockJSONLoggingView(LoggingMixin, APIView):
         return Response({'post': 'response'})
 
 
+class MockMutatingDataLoggingView(LoggingMixin, APIView):
+    def post(self, request):
+        request.data['nested']['val'] = 'changed'
+        request.data['items'].append({'val': 'added'})
+        return Response('with logging')
+
+
 class MockMultipartLoggingView(LoggingMixin, APIView):
     def post(self, request):
         return Response({'post': 'response'})
@@ -198,6 +212,10 @@ class MockNameAPIView(LoggingMixin, APIView):
         return Response('with logging')
 
 
+class MockChildNameAPIView(MockNameAPIView):
+    pass
+
+
 class MockNameViewSet(LoggingMixin, viewsets.GenericViewSet, mixins.ListModelMixin):
     authentication_classes = ()
     permission_classes = []